@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+from scipy.special import ndtr
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+# 1 / sqrt(2 * pi)
+_INV_SQRT_2PI = 0.3989422804014327
+# 1 / sqrt(2)
+_INV_SQRT_2 = 0.7071067811865476
+
+
+def bsm_price(sigma, S, K, T, r, q, is_call):
+    """Black-Scholes-Merton price, vectorized over NumPy arrays."""
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
+    disc_q = np.exp(-q * T)
+    disc_r = np.exp(-r * T)
+    call = S * disc_q * ndtr(d1) - K * disc_r * ndtr(d2)
+    put = K * disc_r * ndtr(-d2) - S * disc_q * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def _implied_vol_numpy(prices, spots, strikes, Ts, r, q, is_call, max_iter, tol):
+    """NumPy whole-array Newton solve; used when Numba is unavailable."""
+    # Terms that are constant across Newton iterations
+    sqrt_T = np.sqrt(Ts)
+    log_moneyness = np.log(spots / strikes)
+    disc_q = np.exp(-q * Ts)
+    disc_r = np.exp(-r * Ts)
+    # Fold the call/put branch into a +-1 sign once, up front: the loop then
+    # evaluates a single pricing expression (two ndtr calls) instead of
+    # computing both legs and np.where-selecting every iteration
+    sign = np.where(is_call, 1.0, -1.0)
+
+    # Brenner-Subrahmanyam initial guess, clipped to a sane vol range
+    sigma = np.sqrt(2.0 * np.pi / Ts) * prices / spots
+    sigma = np.clip(sigma, 1e-3, 5.0)
+
+    diff = np.full_like(sigma, np.inf)
+    for _ in range(max_iter):
+        d1 = (log_moneyness + (r - q + 0.5 * sigma * sigma) * Ts) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        model = sign * (spots * disc_q * ndtr(sign * d1)
+                        - strikes * disc_r * ndtr(sign * d2))
+        vega = spots * disc_q * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1) * sqrt_T
+        diff = model - prices
+
+        # Householder(3) step: reuse vomma/vega and ultima/vega ratios so
+        # each iteration kills roughly three Newton iterations
+        h = diff / np.maximum(vega, 1e-12)
+        d1d2 = d1 * d2
+        v_ratio = d1d2 / sigma  # vomma / vega
+        u_ratio = -(d1d2 * (1.0 - d1d2) + d1 * d1 + d2 * d2) / (sigma * sigma)  # ultima / vega
+        denom = 1.0 - h * v_ratio + (h * h) * u_ratio / 6.0
+        step = np.where(np.abs(denom) > 1e-12,
+                        h * (1.0 - 0.5 * h * v_ratio) / denom,
+                        h)  # fall back to plain Newton on degenerate curvature
+        sigma = np.clip(sigma - step, 1e-4, 10.0)
+
+    # Flag non-converged entries instead of raising per element
+    return np.where(np.abs(diff) < tol, sigma, np.nan)
+
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _implied_vol_numba(prices, spots, strikes, Ts, r, q, is_call, max_iter, tol):
+        """Loop-style Newton kernel; prange parallelizes across options."""
+        n = prices.shape[0]
+        out = np.empty(n)
+        for i in prange(n):
+            price = prices[i]
+            S = spots[i]
+            K = strikes[i]
+            T = Ts[i]
+            sqrt_T = math.sqrt(T)
+            log_moneyness = math.log(S / K)
+            disc_q = math.exp(-q * T)
+            disc_r = math.exp(-r * T)
+
+            # Branchless call/put handling keeps the inner loop a straight
+            # line of arithmetic, which vectorizes under fastmath
+            sign = 1.0 if is_call[i] else -1.0
+
+            sigma = math.sqrt(2.0 * math.pi / T) * price / S
+            if sigma < 1e-3:
+                sigma = 1e-3
+            elif sigma > 5.0:
+                sigma = 5.0
+
+            diff = math.inf
+            for _ in range(max_iter):
+                d1 = (log_moneyness + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
+                d2 = d1 - sigma * sqrt_T
+                model = sign * (S * disc_q * 0.5 * math.erfc(-sign * d1 * _INV_SQRT_2)
+                                - K * disc_r * 0.5 * math.erfc(-sign * d2 * _INV_SQRT_2))
+                vega = S * disc_q * _INV_SQRT_2PI * math.exp(-0.5 * d1 * d1) * sqrt_T
+                if vega < 1e-12:
+                    vega = 1e-12
+                diff = model - price
+
+                # Householder(3) step (see _implied_vol_numpy); all scalars,
+                # so the intermediates stay in registers
+                h = diff / vega
+                d1d2 = d1 * d2
+                v_ratio = d1d2 / sigma
+                u_ratio = -(d1d2 * (1.0 - d1d2) + d1 * d1 + d2 * d2) / (sigma * sigma)
+                denom = 1.0 - h * v_ratio + (h * h) * u_ratio / 6.0
+                if abs(denom) > 1e-12:
+                    step = h * (1.0 - 0.5 * h * v_ratio) / denom
+                else:
+                    step = h
+                sigma = sigma - step
+                if sigma < 1e-4:
+                    sigma = 1e-4
+                elif sigma > 10.0:
+                    sigma = 10.0
+
+            out[i] = sigma if abs(diff) < tol else np.nan
+        return out
+
+
+def _bisect_fallback(prices, spots, strikes, Ts, r, q, is_call, tol,
+                     lo=1e-4, hi=10.0, n_iter=48):
+    """Geometric-midpoint bisection for entries the Householder solve rejected.
+
+    For a positive bracket, bisecting on sqrt(lo*hi) is the arithmetic
+    analogue of float-bit bisection: it halves the exponent range first, so
+    ~48 steps pin sigma across [1e-4, 10] where arithmetic midpoints would
+    burn most iterations crossing binades. Runs only on the (small) failed
+    subset; entries with no root in the bracket stay NaN.
+    """
+    lo = np.full(prices.shape, lo)
+    hi = np.full(prices.shape, hi)
+    f_lo = bsm_price(lo, spots, strikes, Ts, r, q, is_call) - prices
+    f_hi = bsm_price(hi, spots, strikes, Ts, r, q, is_call) - prices
+    bracketed = (f_lo <= 0) & (f_hi >= 0)  # price is increasing in sigma
+
+    for _ in range(n_iter):
+        mid = np.sqrt(lo * hi)
+        f_mid = bsm_price(mid, spots, strikes, Ts, r, q, is_call) - prices
+        hi = np.where(f_mid > 0, mid, hi)
+        lo = np.where(f_mid > 0, lo, mid)
+
+    sigma = np.sqrt(lo * hi)
+    resid = bsm_price(sigma, spots, strikes, Ts, r, q, is_call) - prices
+    return np.where(bracketed & (np.abs(resid) < tol), sigma, np.nan)
+
+
+def implied_vol_batch(prices, spots, strikes, Ts, r=0.05, q=0.015,
+                      is_call=True, max_iter=8, tol=1e-6):
+    """Solve BSM implied vol for whole arrays at once.
+
+    Householder(3) iteration with analytic vega/vomma/ultima ratios,
+    seeded by the Brenner-Subrahmanyam approximation. With Numba installed the solve runs as a parallel
+    JIT-compiled loop (erfc-based CDF, no per-element Python dispatch);
+    otherwise it falls back to whole-array NumPy kernels with ndtr.
+    Entries that fail to converge come back as NaN.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    spots = np.asarray(spots, dtype=np.float64)
+    strikes = np.asarray(strikes, dtype=np.float64)
+    Ts = np.asarray(Ts, dtype=np.float64)
+    is_call = np.ascontiguousarray(
+        np.broadcast_to(np.asarray(is_call, dtype=np.bool_), prices.shape))
+
+    # Solve every option on its OTM side via put-call parity: a deep ITM
+    # price is mostly intrinsic value, which conditions the vega-based solve
+    # badly, while the parity-adjusted OTM price carries the identical IV.
+    parity = spots * np.exp(-q * Ts) - strikes * np.exp(-r * Ts)
+    itm = np.where(is_call, parity > 0, parity < 0)
+    prices = np.where(itm, prices - np.where(is_call, parity, -parity), prices)
+    is_call = np.ascontiguousarray(np.where(itm, ~is_call, is_call))
+
+    if _HAVE_NUMBA:
+        out = _implied_vol_numba(prices, spots, strikes, Ts, r, q, is_call,
+                                 max_iter, tol)
+    else:
+        out = _implied_vol_numpy(prices, spots, strikes, Ts, r, q, is_call,
+                                 max_iter, tol)
+
+    # Robustness fallback: retry the handful of non-converged entries with
+    # guaranteed-progress bisection before giving up on them
+    bad = np.isnan(out)
+    if bad.any():
+        out[bad] = _bisect_fallback(prices[bad], spots[bad], strikes[bad],
+                                    Ts[bad], r, q, is_call[bad], tol)
+    return out
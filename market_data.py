@@ -1,25 +1,41 @@
 import requests
-import datetime
 from typing import Dict, Optional
 import json
 import bisect
 
+import numpy as np
+
+try:
+    import orjson
+
+    def _loads(buf):
+        return orjson.loads(buf)
+except ImportError:
+    def _loads(buf):
+        return json.loads(buf)
+
+# One keep-alive session for every endpoint call
+SESSION = requests.Session()
+
 class MarketData:
     def __init__(self, root: str, date: str):
         self.root = root
         self.date = date
         self.spot_price_data: Dict[int, float] = {}  # ms_of_day -> price mapping
+        # Sorted (ms, price) arrays for bulk searchsorted gathers
+        self.spot_ms = np.empty(0, dtype=np.int64)
+        self.spot_px = np.empty(0, dtype=np.float64)
 
     def get_first_strike(self) -> Optional[int]:
         """Get the first available strike for the given root and date."""
         url = f"http://127.0.0.1:25510/v2/list/strikes?root={self.root}&exp={self.date}"
-        response = requests.get(url)
+        response = SESSION.get(url)
         
         if response.status_code != 200:
             print(f"Error getting strikes: {response.status_code}")
             return None
             
-        data = response.json()
+        data = _loads(response.content)
         if not data["response"]:
             print("No strikes found")
             return None
@@ -36,13 +52,13 @@ class MarketData:
         
         # Construct URL for greeks endpoint
         url = f"http://127.0.0.1:25510/v2/hist/option/greeks?root={self.root}&exp={self.date}&strike={strike}&right=C&start_date={self.date}&end_date={self.date}&ivl=500"
-        response = requests.get(url)
+        response = SESSION.get(url)
         
         if response.status_code != 200:
             print(f"Error getting spot prices: {response.status_code}")
             return
             
-        data = response.json()
+        data = _loads(response.content)
         
         # Get indices from header format
         header_format = data["header"]["format"]
@@ -54,9 +70,24 @@ class MarketData:
             tick[MS_IDX]: tick[PRICE_IDX]
             for tick in data["response"]
         }
-        
+
+        # Build the sorted lookup arrays once so per-tick consumers can
+        # gather spots in bulk instead of probing the dict
+        self.spot_ms = np.fromiter(self.spot_price_data.keys(), dtype=np.int64)
+        self.spot_px = np.fromiter(self.spot_price_data.values(), dtype=np.float64)
+        order = np.argsort(self.spot_ms)
+        self.spot_ms = self.spot_ms[order]
+        self.spot_px = self.spot_px[order]
+
         print(f"Loaded {len(self.spot_price_data)} spot price points")
 
+    def get_spot_prices_bulk(self, ms_array: np.ndarray) -> np.ndarray:
+        """Gather spot prices for an array of ms_of_day keys; NaN where missing."""
+        if not len(self.spot_ms):
+            return np.full(len(ms_array), np.nan)
+        idx = np.clip(np.searchsorted(self.spot_ms, ms_array), 0, len(self.spot_ms) - 1)
+        return np.where(self.spot_ms[idx] == ms_array, self.spot_px[idx], np.nan)
+
     def get_spot_price(self, ms_of_day: int) -> Optional[float]:
         if ms_of_day not in self.spot_price_data:
             return None
@@ -70,21 +101,24 @@ class MarketData:
         
         try:
             print(f"Requesting initial data from: {url}")
-            response = requests.get(url)
+            response = SESSION.get(url)
             if response.status_code != 200:
                 print(f"Error: {response.status_code}")
                 return None
             
             try:
-                data = response.json()
+                data = _loads(response.content)
                 print(f"Initial data received with {len(data['response'])} responses")
-            except requests.exceptions.JSONDecodeError as e:
-                print(f"JSON decode error at position {e.pos}. Attempting to truncate and parse...")
-                valid_json = response.text[:e.pos]
+            except ValueError as e:
+                # Both orjson and stdlib json raise ValueError subclasses;
+                # stdlib carries the failing offset in .pos
+                pos = getattr(e, 'pos', len(response.text))
+                print(f"JSON decode error at position {pos}. Attempting to truncate and parse...")
+                valid_json = response.text[:pos]
                 last_bracket = valid_json.rfind(']')
                 if last_bracket != -1:
                     valid_json = valid_json[:last_bracket+1] + ']}'
-                    data = json.loads(valid_json)
+                    data = _loads(valid_json)
                 else:
                     print("Could not recover valid JSON")
                     return None
@@ -100,16 +134,16 @@ class MarketData:
                 
                 print(f"Fetching next page: {next_page}")
                 try:
-                    response = requests.get(next_page)
+                    response = SESSION.get(next_page)
                     if response.status_code != 200:
                         print(f"Error fetching next page: {response.status_code}")
                         break
                     
-                    data = response.json()
+                    data = _loads(response.content)
                     all_responses.extend(data["response"])
                     print(f"got next page with {len(data['response'])} responses")
                     
-                except requests.exceptions.JSONDecodeError as e:
+                except ValueError as e:
                     print(f"Error on pagination, stopping here with {len(all_responses)} total responses")
                     break
                 except Exception as e:
@@ -127,13 +161,13 @@ class MarketData:
         """Get all trades for a given root on a specific day."""
         print(f"getting trades for {self.root} on {self.date}")
         url = f"http://127.0.0.1:25510/v2/bulk_hist/option/trade?root={self.root}&exp=0&start_date={self.date}&end_date={self.date}"
-        response = requests.get(url)
+        response = SESSION.get(url)
         
         if response.status_code != 200:
             print(f"Error: {response.status_code}")
             return None
             
-        data = response.json()
+        data = _loads(response.content)
         all_responses = data["response"]
         print(f"got first page")
         
@@ -143,13 +177,13 @@ class MarketData:
             if next_page == "null" or next_page is None:
                 break
                 
-            response = requests.get(next_page)
+            response = SESSION.get(next_page)
             if response.status_code != 200:
                 print(f"Error fetching next page: {response.status_code}")
                 break
             print(f"got next page")
                 
-            data = response.json()
+            data = _loads(response.content)
             all_responses.extend(data["response"])
         
         return {"header": data["header"], "response": all_responses}
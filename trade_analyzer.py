@@ -5,10 +5,21 @@ from dataclasses import dataclass
 from typing import List, Dict, Any
 from market_data import MarketData
 from curve_fitting import MLInterpolator
+from iv_solver import implied_vol_batch
 from matplotlib.widgets import Slider
-import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import os
 
-@dataclass
+@lru_cache(maxsize=65536)
+def _scalar_iv_cached(price, S, K, T, flag):
+    """Memoized scalar py_vollib solve; inputs are pre-quantized by callers."""
+    try:
+        return iv_bsm(price=price, S=S, K=K, t=T, r=0.05, q=0.015, flag=flag)
+    except Exception:
+        return None
+
+@dataclass(slots=True)
 class Trade:
     time: float  # Hours since market open
     ms_of_day: int
@@ -23,40 +34,147 @@ class Trade:
     iv: float = None
     rel_strike: float = None
 
+class TradeTable:
+    """Struct-of-arrays trade store: one contiguous NumPy column per field.
+
+    Downstream consumers read whole columns (cheap views) instead of
+    walking a list of dataclasses attribute by attribute.
+    """
+
+    def __init__(self, time, ms_of_day, price, size, is_call, strike,
+                 spot_price, iv, rel_strike):
+        self.time = time
+        self.ms_of_day = ms_of_day
+        self.price = price
+        self.size = size
+        self.is_call = is_call
+        self.strike = strike
+        self.spot_price = spot_price
+        self.iv = iv
+        self.rel_strike = rel_strike
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.empty(0) for _ in range(9)))
+
+    def __len__(self):
+        return len(self.time)
+
+    def row(self, i: int) -> Trade:
+        """Materialize a single row as a Trade, for scalar consumers."""
+        return Trade(
+            time=self.time[i],
+            ms_of_day=int(self.ms_of_day[i]),
+            price=self.price[i],
+            size=self.size[i],
+            right='C' if self.is_call[i] else 'P',
+            strike=self.strike[i],
+            spot_price=self.spot_price[i],
+            is_buyer=True,
+            iv=self.iv[i],
+            rel_strike=self.rel_strike[i],
+        )
+
 class TradeAnalyzer:
     def __init__(self, root: str, date: str):
         self.market_data = MarketData(root, date)
-        self.trades: List[Trade] = []
+        self.trades: TradeTable = TradeTable.empty()
         
+    def calculate_iv_batch(self, prices: np.ndarray, spots: np.ndarray,
+                           strikes: np.ndarray, times: np.ndarray,
+                           is_call: np.ndarray) -> np.ndarray:
+        """Calculate implied volatilities for whole columns in one vectorized solve."""
+        # For 0DTE, use a minimum of 1 minute to expiry
+        T = np.maximum((16 - times) / 24 / 365, 1 / 24 / 365)
+
+        return implied_vol_batch(prices, spots, strikes, T, r=0.05, q=0.015,
+                                 is_call=is_call)
+
     def calculate_iv(self, trade: Trade) -> float:
-        """Calculate implied volatility for a trade."""
-        try:
-            # For 0DTE, use a minimum of 1 minute to expiry
-            T = max((16 - trade.time) / 24 / 365, 1/24/365)
-            r = 0.05
-            q = 0.015
-            
-            iv = iv_bsm(
-                price=trade.price,
-                S=trade.spot_price,
-                K=trade.strike,
-                t=T,
-                r=r,
-                q=q,
-                flag=trade.right.lower()
-            )
-            
-            return iv if 0 < iv < 2 else None  # Tighter bounds for 0DTE
-        except:
-            return None
+        """Calculate implied volatility for a trade (scalar fallback)."""
+        # For 0DTE, use a minimum of 1 minute to expiry
+        T = max((16 - trade.time) / 24 / 365, 1/24/365)
+
+        # Quantize the inputs so repeated quotes at the same price/spot hit
+        # the memo instead of re-running the solver
+        iv = _scalar_iv_cached(round(float(trade.price), 4),
+                               round(float(trade.spot_price), 4),
+                               float(trade.strike),
+                               round(T, 9),
+                               trade.right.lower())
+        return iv if iv is not None and 0 < iv < 2 else None  # Tighter bounds for 0DTE
     
-    def load_data(self, trade_type: str = 'trade'):
-        """Load and process trade data with optimization for 0DTE."""
-        print("Loading spot prices...")
-        self.market_data.load_spot_prices()
-        
-        print("Loading trade data...")
-        data = self.market_data.get_day_trades() if trade_type == 'trade' else self.market_data.get_day_trade_quotes()
+    def _ingest_response(self, response, TIME_IDX: int, PRICE_IDX: int,
+                         SIZE_IDX: int):
+        """Parse one response into (ms, time, price, size, strike, is_call, spot)
+        column blocks, or None if nothing survives the filters."""
+        strike = response["contract"]["strike"] / 1000
+        is_call = response["contract"]["right"] == 'C'
+
+        ticks = np.asarray(response["ticks"], dtype=np.float64)
+        if ticks.size == 0:
+            return None
+
+        # Pull the needed columns out of the row-major tick matrix once, as
+        # dense 1-D arrays, so the masking below reads unit-stride memory
+        price = np.ascontiguousarray(ticks[:, PRICE_IDX])
+        size = np.ascontiguousarray(ticks[:, SIZE_IDX])
+
+        # Snap to the 500ms grid in pure integer arithmetic
+        ms = ticks[:, TIME_IDX].astype(np.int64)
+        rounded_ms = ((ms + 250) // 500) * 500
+        time = rounded_ms / (1000 * 3600)
+
+        # Keep trades inside market hours (9:30 AM to 4:00 PM)
+        mask = (time >= 9.5) & (time <= 16)
+
+        # Bulk spot lookup; NaNs (no matching spot point) fail the > 0 test
+        spot = self.market_data.get_spot_prices_bulk(rounded_ms)
+        mask &= spot > 0
+
+        if not mask.any():
+            return None
+
+        return (
+            rounded_ms[mask],
+            time[mask],
+            price[mask],
+            size[mask],
+            np.full(mask.sum(), strike),
+            np.full(mask.sum(), is_call),
+            spot[mask],
+        )
+
+    def _cache_path(self, trade_type: str) -> str:
+        return (f"trades_{self.market_data.root}_{self.market_data.date}"
+                f"_{trade_type}.npz")
+
+    _COLUMNS = ('time', 'ms_of_day', 'price', 'size', 'is_call', 'strike',
+                'spot_price', 'iv', 'rel_strike')
+
+    def load_data(self, trade_type: str = 'trade', use_cache: bool = True):
+        """Load and process trade data with optimization for 0DTE.
+
+        Parsed columns are cached to a compressed npz per (root, date,
+        trade_type); reruns for the same immutable historical day skip the
+        download and parse entirely.
+        """
+        cache_path = self._cache_path(trade_type)
+        if use_cache and os.path.exists(cache_path):
+            cached = np.load(cache_path)
+            self.trades = TradeTable(**{name: cached[name] for name in self._COLUMNS})
+            print(f"Loaded {len(self.trades)} trades from {cache_path}")
+            return
+        # Spot prices and trade data are independent HTTP fetches with no CPU
+        # work between them; overlap the two downloads
+        print("Loading spot prices and trade data concurrently...")
+        fetch_trades = (self.market_data.get_day_trades if trade_type == 'trade'
+                        else self.market_data.get_day_trade_quotes)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            spot_future = executor.submit(self.market_data.load_spot_prices)
+            trade_future = executor.submit(fetch_trades)
+            spot_future.result()
+            data = trade_future.result()
         
         if not data:
             print("No data loaded.")
@@ -66,77 +184,97 @@ class TradeAnalyzer:
         TIME_IDX = header_format.index("ms_of_day")
         PRICE_IDX = header_format.index("price")
         SIZE_IDX = header_format.index("size")
-        
-        processed_trades = []
-        
+
         print(f"Processing responses for 0DTE trades...")
-        for response in data["response"]:
-            expiry = response["contract"]["expiration"]
-            if str(expiry) != str(self.market_data.date):
-                continue
-                
-            strike = response["contract"]["strike"] / 1000
-            
-            for tick in response["ticks"]:
-                ms_of_day = tick[TIME_IDX]
-                rounded_ms = round(ms_of_day / 500) * 500
-                time = rounded_ms / (1000 * 3600)
-                
-                # Skip trades outside market hours (9:30 AM to 4:00 PM)
-                if time < 9.5 or time > 16:
-                    continue
-                
-                spot_price = self.market_data.get_spot_price(rounded_ms)
-                if not spot_price:
-                    continue
-                
-                trade = Trade(
-                    time=time,
-                    ms_of_day=rounded_ms,  # Use rounded ms
-                    price=tick[PRICE_IDX],
-                    size=tick[SIZE_IDX],
-                    right=response["contract"]["right"],
-                    strike=strike,
-                    spot_price=spot_price,
-                    is_buyer=True
-                )
-                
-                trade.iv = self.calculate_iv(trade)
-                if trade.iv is not None:
-                    trade.rel_strike = (trade.strike / trade.spot_price - 1) * 100
-                    processed_trades.append(trade)
-        
-        self.trades = sorted(processed_trades, key=lambda x: x.time)
+        target_date = int(self.market_data.date)
+        responses = [r for r in data["response"]
+                     if int(r["contract"]["expiration"]) == target_date]
+
+        # Responses are independent (one strike/right each) and the parsing
+        # is NumPy-bound, so a thread pool scales across them
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            blocks = [b for b in executor.map(
+                lambda r: self._ingest_response(r, TIME_IDX, PRICE_IDX, SIZE_IDX),
+                responses) if b is not None]
+
+        if blocks:
+            ms_col, time_col, price_col, size_col, strike_col, call_col, spot_col = (
+                np.concatenate(cols) for cols in zip(*blocks))
+
+            # Solve all IVs in one vectorized batch instead of per-trade py_vollib calls
+            ivs = self.calculate_iv_batch(price_col, spot_col, strike_col,
+                                          time_col, call_col)
+            keep = (ivs > 0) & (ivs < 2)  # Tighter bounds for 0DTE; also drops NaNs
+
+            ms_col, time_col, price_col, size_col, strike_col, call_col, spot_col, ivs = (
+                col[keep] for col in (ms_col, time_col, price_col, size_col,
+                                      strike_col, call_col, spot_col, ivs))
+
+            # Sort every column by time once; downstream windowing relies on it.
+            # Float columns are stored as float32: IV is only good to 4-5
+            # significant digits given quote noise, and half-width columns
+            # halve the memory traffic of every downstream pass. The solve
+            # itself stays float64 inside implied_vol_batch.
+            order = np.argsort(time_col, kind='stable')
+            self.trades = TradeTable(
+                time=time_col[order].astype(np.float32),
+                ms_of_day=ms_col[order],
+                price=price_col[order].astype(np.float32),
+                size=size_col[order].astype(np.float32),
+                is_call=call_col[order],
+                strike=strike_col[order].astype(np.float32),
+                spot_price=spot_col[order].astype(np.float32),
+                iv=ivs[order].astype(np.float32),
+                rel_strike=((strike_col / spot_col - 1) * 100)[order].astype(np.float32),
+            )
+        else:
+            self.trades = TradeTable.empty()
         print(f"Processed {len(self.trades)} valid 0DTE trades")
 
+        if use_cache and len(self.trades):
+            np.savez_compressed(
+                cache_path,
+                **{name: getattr(self.trades, name) for name in self._COLUMNS})
+            print(f"Cached parsed trades to {cache_path}")
+
     def plot_iv_surface(self):
         """Plot IV surface and trade flow histogram."""
-        if not self.trades:
+        if not len(self.trades):
             print("No trades to plot")
             return
-        
+
         # Create figure with two subplots
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 12), height_ratios=[2, 1])
         plt.subplots_adjust(bottom=0.2, hspace=0.3)
 
-        times = np.array([t.time for t in self.trades])
-        rel_strikes = np.array([t.rel_strike for t in self.trades])
-        ivs = np.array([t.iv for t in self.trades])
-        sizes = np.array([t.size for t in self.trades])
+        # Column views straight off the SoA table; no per-trade attribute walks
+        times = self.trades.time
+        rel_strikes = self.trades.rel_strike
+        ivs = self.trades.iv
+        sizes = self.trades.size
 
-        # Top subplot - IV Surface
-        scatter = ax1.scatter(rel_strikes, ivs, c='blue', alpha=0.5, s=2)
+        # Top subplot - IV Surface. The scatter, fitted line and title are
+        # animated: excluded from the cached background and blitted manually.
+        # The scatter starts empty; update() below fills it with the first
+        # window, so there is no point building paths for the whole day.
+        scatter = ax1.scatter([], [], c='blue', alpha=0.5, s=2)
+        scatter.set_animated(True)
         line, = ax1.plot([], [], 'r-', lw=2, label='Fitted Curve')
+        line.set_animated(True)
+        title = ax1.set_title('')
+        title.set_animated(True)
         ax1.set_xlabel('Relative Strike (%)')
         ax1.set_ylabel('Implied Volatility')
         ax1.grid(True)
         ax1.legend()
 
-        # Bottom subplot - Flow Histogram
-        bars = ax2.bar([], [], width=0.2, alpha=0.6)
+        # Bottom subplot - Flow Histogram. Labels, grid and the zero line
+        # are created once; update() only swaps the bar patches.
         ax2.set_xlabel('Relative Strike (%)')
         ax2.set_ylabel('Net Flow (Contracts)')
         ax2.grid(True)
+        ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+        bar_state = {'bars': ax2.bar([], [], width=0.2, alpha=0.6)}
 
         # Time slider
         ax_time = plt.axes([0.1, 0.1, 0.65, 0.03])
@@ -148,12 +286,68 @@ class TradeAnalyzer:
         window_slider = Slider(ax_window, 'Window (trades)', 50, 500,
                              valinit=500, valstep=50)
 
+        # Reused scatter-offsets buffer; avoids an np.c_ copy per slider event
+        scatter_buf = np.empty((int(window_slider.valmax), 2))
+
+        # Factorize strikes once; per-event flow aggregation then reduces to
+        # two bincounts over a code slice instead of an np.unique sort
+        unique_all_strikes, strike_codes = np.unique(rel_strikes, return_inverse=True)
+
+        # Fitted curves keyed by window bounds, so dragging the slider back
+        # over a window it has already seen doesn't retrain the interpolator
+        fit_cache: Dict[tuple, tuple] = {}
+        FIT_CACHE_MAX = 64
+
+        # Bounds of the last rendered window; slider events that don't move
+        # the window skip recomputation entirely
+        last_window = {'key': None}
+
+        # Blit support: cached canvas background + the axis limits it was
+        # captured under. A full draw recaptures it via the draw_event hook.
+        blit_state = {'bg': None, 'limits': None}
+
+        def _draw_animated():
+            ax1.draw_artist(scatter)
+            ax1.draw_artist(line)
+            ax1.draw_artist(title)
+            for rect in bar_state['bars']:
+                ax2.draw_artist(rect)
+
+        def _on_draw(event):
+            # Animated artists are excluded from regular draws, so a full
+            # draw alone would show an empty plot. Capture the clean
+            # background it just produced, then paint the animated artists
+            # on top and push the composed frame (the BlitManager pattern).
+            blit_state['bg'] = fig.canvas.copy_from_bbox(fig.bbox)
+            blit_state['limits'] = (ax1.get_xlim(), ax1.get_ylim(),
+                                    ax2.get_xlim(), ax2.get_ylim())
+            _draw_animated()
+            fig.canvas.blit(fig.bbox)
+
+        fig.canvas.mpl_connect('draw_event', _on_draw)
+
+        def _render(n_trades, current_time):
+            """Repaint after an update: blit when the limits still match the
+            cached background, otherwise fall back to a full draw (whose
+            draw_event recaptures the bg and composites the data on top)."""
+            title.set_text(f'0DTE IV Surface - Time: {current_time:.1f} '
+                           f'(Trades: {n_trades})')
+            limits = (ax1.get_xlim(), ax1.get_ylim(),
+                      ax2.get_xlim(), ax2.get_ylim())
+            if blit_state['bg'] is not None and limits == blit_state['limits']:
+                fig.canvas.restore_region(blit_state['bg'])
+                _draw_animated()
+                fig.canvas.blit(fig.bbox)
+            else:
+                fig.canvas.draw_idle()
+
         def update(val):
             current_time = time_slider.val
             window_size = int(window_slider.val)
 
-            # Find the index closest to current time
-            current_idx = np.argmin(np.abs(times - current_time))
+            # Find the index closest to current time; times is sorted, so
+            # bisect instead of an O(N) abs-diff scan
+            current_idx = min(np.searchsorted(times, current_time), len(times) - 1)
             
             # Get window of trades centered on current time
             start_idx = max(0, current_idx - window_size // 2)
@@ -163,70 +357,96 @@ class TradeAnalyzer:
             if end_idx == len(times):
                 start_idx = max(0, end_idx - window_size)
 
+            # Same window as last event: only the title (slider time) changes
+            if last_window['key'] == (start_idx, end_idx):
+                _render(end_idx - start_idx, current_time)
+                return
+            last_window['key'] = (start_idx, end_idx)
+
             current_strikes = rel_strikes[start_idx:end_idx]
             current_ivs = ivs[start_idx:end_idx]
             current_sizes = sizes[start_idx:end_idx]
 
             if len(current_strikes) > 5:
-                # Update IV scatter and fit
-                scatter.set_offsets(np.c_[current_strikes, current_ivs])
+                # Hoist the window min/max scans; reused for the fit grid and axes
+                strike_min = current_strikes.min()
+                strike_max = current_strikes.max()
+
+                # Update IV scatter and fit via the preallocated buffer
+                n = len(current_strikes)
+                scatter_buf[:n, 0] = current_strikes
+                scatter_buf[:n, 1] = current_ivs
+                scatter.set_offsets(scatter_buf[:n])
 
                 try:
-                    interpolator = MLInterpolator(current_strikes, current_ivs, smoothing_factor=0.3)
-                    x_smooth = np.linspace(current_strikes.min(), current_strikes.max(), 100)
-                    y_smooth = interpolator(x_smooth)
-                    line.set_data(x_smooth, y_smooth)
+                    fit = fit_cache.get((start_idx, end_idx))
+                    if fit is None:
+                        interpolator = MLInterpolator(current_strikes, current_ivs, smoothing_factor=0.3)
+                        x_smooth = np.linspace(strike_min, strike_max, 100)
+                        fit = (x_smooth, interpolator(x_smooth))
+                        if len(fit_cache) >= FIT_CACHE_MAX:
+                            fit_cache.pop(next(iter(fit_cache)))
+                        fit_cache[(start_idx, end_idx)] = fit
+                    line.set_data(*fit)
                 except Exception as e:
                     print(f"Fitting error: {e}")
                     line.set_data([], [])
 
                 # Update histogram
-                # Calculate net flow by strike
-                unique_strikes = np.unique(current_strikes)
-                net_flows = []
-                for strike in unique_strikes:
-                    mask = current_strikes == strike
-                    # Calculate net flow (negative for sells, positive for buys)
-                    flows = current_sizes[mask]
-                    net_flow = np.sum(flows)  # Sum will preserve sign
-                    net_flows.append(net_flow)
-
-                # Clear previous bars
-                ax2.clear()
-                ax2.grid(True)
-                ax2.set_xlabel('Relative Strike (%)')
-                ax2.set_ylabel('Net Flow (Contracts)')
-                
-                # Plot new bars with skinnier width and proper coloring
-                colors = ['red' if flow < 0 else 'green' for flow in net_flows]
-                ax2.bar(unique_strikes, net_flows, width=0.1, color=colors, alpha=0.7)
-                
-                # Add horizontal line at y=0 for reference
-                ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-                
+                # Net flow by strike off the precomputed codes
+                # (sum preserves sign: negative for sells, positive for buys)
+                codes = strike_codes[start_idx:end_idx]
+                counts = np.bincount(codes, minlength=len(unique_all_strikes))
+                flows = np.bincount(codes, weights=current_sizes,
+                                    minlength=len(unique_all_strikes))
+                present = counts > 0
+                unique_strikes = unique_all_strikes[present]
+                net_flows = flows[present]
+
+                # Swap just the bar patches; the rest of the axes persists
+                for rect in bar_state['bars']:
+                    rect.remove()
+                colors = np.where(net_flows < 0, 'red', 'green')
+                bar_state['bars'] = ax2.bar(unique_strikes, net_flows, width=0.1,
+                                            color=colors, alpha=0.7)
+                for rect in bar_state['bars']:
+                    rect.set_animated(True)
+
+
                 # Set axis limits
-                ax1.set_xlim(current_strikes.min() - 1, current_strikes.max() + 1)
+                ax1.set_xlim(strike_min - 1, strike_max + 1)
                 ax1.set_ylim(max(0, current_ivs.min() - 0.1), min(2, current_ivs.max() + 0.1))
-                ax2.set_xlim(current_strikes.min() - 1, current_strikes.max() + 1)
+                ax2.set_xlim(strike_min - 1, strike_max + 1)
                 
                 # Set y-axis limits symmetrically around zero for better visualization
-                max_abs_flow = max(abs(min(net_flows)), abs(max(net_flows)))
+                max_abs_flow = np.abs(net_flows).max()
                 ax2.set_ylim(-max_abs_flow * 1.1, max_abs_flow * 1.1)
 
             else:
-                scatter.set_offsets(np.c_[[], []])
+                scatter.set_offsets(np.empty((0, 2)))
                 line.set_data([], [])
-                ax2.clear()
-                ax2.grid(True)
-                ax2.set_xlabel('Relative Strike (%)')
-                ax2.set_ylabel('Net Flow (Contracts)')
+                for rect in bar_state['bars']:
+                    rect.remove()
+                bar_state['bars'] = ax2.bar([], [], width=0.1)
+
+            _render(len(current_strikes), current_time)
+
+        # Debounce: slider drags fire on_changed per pixel, so coalesce
+        # bursts into a single update once events go quiet for ~30ms.
+        # update() reads the slider values itself, so the latest value wins.
+        debounce = {'timer': None}
 
-            # Update title with current time and number of trades
-            ax1.set_title(f'0DTE IV Surface - Time: {current_time:.1f} (Trades: {len(current_strikes)})')
-            fig.canvas.draw_idle()
+        def schedule_update(val):
+            if debounce['timer'] is not None:
+                debounce['timer'].stop()
+            timer = fig.canvas.new_timer(interval=30)
+            timer.single_shot = True
+            timer.add_callback(update, None)
+            timer.start()
+            debounce['timer'] = timer
 
-        time_slider.on_changed(update)
-        window_slider.on_changed(update)
+        time_slider.on_changed(schedule_update)
+        window_slider.on_changed(schedule_update)
         update(None)
 
         plt.show()